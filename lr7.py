@@ -1,78 +1,137 @@
 import sys
 import io
+import atexit
+import asyncio
 import logging
+import queue
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 import functools
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+import time
+import threading
 import requests
 import unittest
-import json
+from unittest import mock
+import orjson
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util import Retry
 
 # 1. Реализация декоратора logger
-def logger(func=None, *, handle=sys.stdout):
+def _make_emitter(handle, level):
+    """
+    Возвращает функцию, выводящую сообщение уровня level ('INFO', 'WARNING', 'ERROR') в handle.
+    Тип обработчика определяется один раз, при создании декоратора.
+    """
+    if hasattr(handle, 'info') and hasattr(handle, 'error'):
+        # logging.Logger: вызываем метод соответствующего уровня
+        return getattr(handle, level.lower())
+    # Поток (sys.stdout, io.StringIO): пишем строку с префиксом уровня
+    prefix = level + ": "
+    write = handle.write
+    return lambda msg: write(prefix + msg + "\n")
+
+
+class Logger:
     """
     Параметризуемый декоратор для логирования вызовов функций.
     handle: sys.stdout, io.StringIO, logging.Logger
     """
-    if func is None:
-        # Если handle передан, возвращаем частично применённый декоратор
-        return lambda f: logger(f, handle=handle)
+    __slots__ = ('handle', '_info', '_error', '_is_enabled')
+
+    def __init__(self, handle=sys.stdout):
+        self.handle = handle
+        self._info = _make_emitter(handle, 'INFO')
+        self._error = _make_emitter(handle, 'ERROR')
+        # У logging.Logger уровень может меняться во время работы, поэтому он проверяется
+        # при каждом вызове; для потоков (_is_enabled is None) сообщения выводятся всегда
+        self._is_enabled = getattr(handle, 'isEnabledFor', None)
+
+    def __call__(self, func):
+        name = func.__name__
+        emit_info = self._info
+        emit_error = self._error
+        is_enabled = self._is_enabled
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            # Логируем старт вызова; аргументы форматируются, только если сообщение будет выведено
+            if is_enabled is None or is_enabled(logging.INFO):
+                if not kwargs:
+                    all_args_str = ', '.join(map(repr, args))
+                else:
+                    all_args_str = ', '.join(chain(map(repr, args), (f"{k}={v!r}" for k, v in kwargs.items())))
+                emit_info(f"Calling {name}({all_args_str})")
 
-    @functools.wraps(func)
-    def inner(*args, **kwargs):
-        # Определяем тип обработчика
-        is_logging_obj = hasattr(handle, 'info') and hasattr(handle, 'error')
-
-        # Формируем строку аргументов
-        args_str = ', '.join(map(repr, args))
-        kwargs_str = ', '.join(f"{k}={v!r}" for k, v in kwargs.items())
-        all_args_str = ', '.join(filter(None, [args_str, kwargs_str]))
-
-        # Логируем старт вызова
-        start_msg = f"INFO: Calling {func.__name__}({all_args_str})\n"
-        if is_logging_obj:
-            handle.info(f"Calling {func.__name__}({all_args_str})")
-        else:
-            handle.write(start_msg)
+            try:
+                result = func(*args, **kwargs)
+                # Логируем успешное завершение
+                if is_enabled is None or is_enabled(logging.INFO):
+                    emit_info(f"{name} returned {result!r}")
+                return result
+            except Exception as e:
+                # Логируем ошибку
+                if is_enabled is None or is_enabled(logging.ERROR):
+                    emit_error(f"{name} raised {type(e).__name__}: {e}")
+                # Повторно выбрасываем исключение
+                raise
 
-        try:
-            result = func(*args, **kwargs)
-            # Логируем успешное завершение
-            success_msg = f"INFO: {func.__name__} returned {result!r}\n"
-            if is_logging_obj:
-                handle.info(f"{func.__name__} returned {result!r}")
-            else:
-                handle.write(success_msg)
-            return result
-        except Exception as e:
-            # Логируем ошибку
-            error_msg = f"ERROR: {func.__name__} raised {type(e).__name__}: {e}\n"
-            if is_logging_obj:
-                handle.error(f"{func.__name__} raised {type(e).__name__}: {e}")
-            else:
-                handle.write(error_msg)
-            # Повторно выбрасываем исключение
-            raise
+        return inner
 
-    return inner
+
+def logger(func=None, *, handle=sys.stdout):
+    """
+    Функциональная форма Logger: @logger или @logger(handle=...).
+    handle: sys.stdout, io.StringIO, logging.Logger
+    """
+    if func is None:
+        # Если handle передан, возвращаем настроенный декоратор
+        return Logger(handle)
+    return Logger(handle)(func)
 
 
 # 2. Реализация функции get_currencies (только бизнес-логика, без handle)
-def get_currencies(currency_codes: list, url="https://www.cbr-xml-daily.ru/daily_json.js") -> dict:
+# Кэш ответов API: {url: (время_истечения, данные_Valute)}.
+# Курсы ЦБ обновляются раз в сутки, поэтому повторные запросы в пределах TTL не нужны.
+# Размер ограничен _VALUTE_CACHE_MAXSIZE записями (каждая ~20 КБ): при переполнении
+# удаляются устаревшие записи, а если их нет - самая старая.
+_VALUTE_CACHE_TTL = 600
+_VALUTE_CACHE_MAXSIZE = 128
+_valute_cache = {}
+_valute_cache_lock = threading.Lock()  # запись в кэш идёт из потоков get_currencies_parallel
+
+# Общая HTTP-сессия: TCP/TLS-соединение с API переиспользуется между вызовами,
+# временные ошибки 5xx повторяются автоматически.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]),
+))
+atexit.register(_session.close)
+
+
+def _fetch_valute(url: str) -> dict:
     """
-    Получает курсы валют по кодам из API ЦБ РФ.
-    Возвращает словарь {код_валюты: курс}.
-    Выбрасывает исключения в случае ошибок.
+    Загружает словарь 'Valute' из API ЦБ РФ с кэшированием на _VALUTE_CACHE_TTL секунд.
+    В кэш попадают только успешно полученные данные.
     """
+    now = time.monotonic()
+    cached = _valute_cache.get(url)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
     try:
-        response = requests.get(url, timeout=5)
+        response = _session.get(url, timeout=(2, 5))
         response.raise_for_status()  # Возбуждает исключение при HTTP ошибках (4xx, 5xx)
     except RequestException as e:
         # API недоступен
         raise ConnectionError(f"API недоступен: {e}")
 
     try:
-        data = response.json()
-    except json.JSONDecodeError:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
         # Некорректный JSON
         raise ValueError("Ответ API содержит некорректный JSON")
 
@@ -81,25 +140,76 @@ def get_currencies(currency_codes: list, url="https://www.cbr-xml-daily.ru/daily
         raise KeyError("В ответе API отсутствует ключ 'Valute'")
 
     valute_data = data["Valute"]
-    result = {}
+    with _valute_cache_lock:
+        # Удаляем старую запись, чтобы обновлённый URL оказался в конце порядка вставки
+        _valute_cache.pop(url, None)
+        if len(_valute_cache) >= _VALUTE_CACHE_MAXSIZE:
+            for key in [k for k, (expires, _) in _valute_cache.items() if expires <= now]:
+                del _valute_cache[key]
+        if len(_valute_cache) >= _VALUTE_CACHE_MAXSIZE:
+            del _valute_cache[next(iter(_valute_cache))]
+        _valute_cache[url] = (now + _VALUTE_CACHE_TTL, valute_data)
+    return valute_data
 
-    for code in currency_codes:
-        if code not in valute_data:
-            # Валюта отсутствует в данных
-            raise KeyError(f"Валюта '{code}' отсутствует в данных API")
 
-        currency_info = valute_data[code]
-        # Проверяем, что поле 'Value' существует и имеет числовой тип
-        value = currency_info.get("Value")
-        if value is None or not isinstance(value, (int, float)):
+def get_currencies(currency_codes: list, url="https://www.cbr-xml-daily.ru/daily_json.js") -> dict:
+    """
+    Получает курсы валют по кодам из API ЦБ РФ.
+    Возвращает словарь {код_валюты: курс}.
+    Выбрасывает исключения в случае ошибок.
+    """
+    valute_data = _fetch_valute(url)
+
+    if not valute_data.keys() >= set(currency_codes):
+        # Валюта отсутствует в данных (сообщаем о первой по порядку запроса)
+        missing = next(code for code in currency_codes if code not in valute_data)
+        raise KeyError(f"Валюта '{missing}' отсутствует в данных API")
+
+    result = {code: valute_data[code].get("Value") for code in currency_codes}
+
+    # Проверяем, что поле 'Value' существует и имеет числовой тип
+    for code, value in result.items():
+        if not isinstance(value, (int, float)):
             # Курс валюты имеет неверный тип
             raise TypeError(f"Курс валюты '{code}' имеет неверный тип или отсутствует")
 
-        result[code] = value
-
     return result
 
 
+# Общий пул потоков для параллельных запросов; потоки разделяют соединения _session
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="currfetch")
+atexit.register(_executor.shutdown, wait=False)
+
+
+def get_currencies_parallel(currency_codes: list, urls: list) -> list:
+    """
+    Запрашивает одни и те же валюты сразу из нескольких источников (URL).
+    Возвращает список словарей в порядке переданных URL.
+    Исключение первого по порядку неудачного запроса пробрасывается вызывающему коду.
+    """
+    futures = [_executor.submit(get_currencies, currency_codes, url) for url in urls]
+    return [future.result() for future in futures]
+
+
+async def get_currencies_async(currency_codes: list, url="https://www.cbr-xml-daily.ru/daily_json.js") -> dict:
+    """
+    Асинхронная обёртка над get_currencies.
+    Запрос выполняется в общем пуле потоков, чтобы не блокировать цикл событий.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, get_currencies, currency_codes, url)
+
+
+async def get_currencies_batch(list_of_code_lists: list, urls: list) -> list:
+    """
+    Выполняет несколько запросов get_currencies одновременно.
+    Возвращает список словарей в порядке переданных URL.
+    """
+    return await asyncio.gather(
+        *(get_currencies_async(codes, url) for codes, url in zip(list_of_code_lists, urls, strict=True))
+    )
+
+
 # 3. Оборачивание функции в декоратор
 @logger(handle=sys.stdout)
 def get_currencies_stdout(currency_codes: list, url="https://www.cbr-xml-daily.ru/daily_json.js") -> dict:
@@ -113,7 +223,16 @@ file_logger.setLevel(logging.DEBUG)
 file_handler = logging.FileHandler("currency_requests.log", mode='w', encoding='utf-8')
 file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 file_handler.setFormatter(file_formatter)
-file_logger.addHandler(file_handler)
+# Записи INFO накапливаются в памяти и сбрасываются в файл пачками, ERROR - сразу
+_log_buffer = MemoryHandler(capacity=64, flushLevel=logging.ERROR, target=file_handler, flushOnClose=True)
+# Запись в файл выполняется фоновым потоком: вызывающий код только кладёт запись в очередь
+_log_queue = queue.SimpleQueue()
+file_logger.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, _log_buffer, respect_handler_level=True)
+_log_listener.start()
+# atexit вызывает функции в обратном порядке: сначала останавливаем поток, затем сбрасываем буфер
+atexit.register(_log_buffer.flush)
+atexit.register(_log_listener.stop)
 
 @logger(handle=file_logger)
 def get_currencies_file_log(currency_codes: list, url="https://www.cbr-xml-daily.ru/daily_json.js") -> dict:
@@ -130,82 +249,89 @@ def solve_quadratic_logger(func=None, *, handle=sys.stdout):
     if func is None:
         return lambda f: solve_quadratic_logger(f, handle=handle)
 
+    emit_info = _make_emitter(handle, 'INFO')
+    emit_warning = _make_emitter(handle, 'WARNING')
+    emit_error = _make_emitter(handle, 'ERROR')
+
     @functools.wraps(func)
     def inner(a, b, c):
-        is_logging_obj = hasattr(handle, 'info') and hasattr(handle, 'error')
-
-        start_msg = f"INFO: Calling solve_quadratic(a={a}, b={b}, c={c})\n"
-        if is_logging_obj:
-            handle.info(f"Calling solve_quadratic(a={a}, b={b}, c={c})")
-        else:
-            handle.write(start_msg)
+        emit_info(f"Calling solve_quadratic(a={a}, b={b}, c={c})")
 
         try:
             result = func(a, b, c)
-            if result == ():
+            len_r = len(result)
+            if len_r == 0:
                 # Нет решений
-                msg = f"WARNING: solve_quadratic({a}, {b}, {c}) has no real solutions.\n"
-                if is_logging_obj:
-                    handle.warning(f"solve_quadratic({a}, {b}, {c}) has no real solutions.")
-                else:
-                    handle.write(msg)
-            elif len(result) == 1:
+                emit_warning(f"solve_quadratic({a}, {b}, {c}) has no real solutions.")
+            elif len_r == 1:
                 # Один корень
-                msg = f"INFO: solve_quadratic({a}, {b}, {c}) has one solution: x = {result[0]:.2f}\n"
-                if is_logging_obj:
-                    handle.info(f"solve_quadratic({a}, {b}, {c}) has one solution: x = {result[0]:.2f}")
-                else:
-                    handle.write(msg)
-            else: # len(result) == 2
+                emit_info(f"solve_quadratic({a}, {b}, {c}) has one solution: x = {result[0]:.2f}")
+            else: # len_r == 2
                 # Два корня
-                msg = f"INFO: solve_quadratic({a}, {b}, {c}) has two solutions: x1 = {result[0]:.2f}, x2 = {result[1]:.2f}\n"
-                if is_logging_obj:
-                    handle.info(f"solve_quadratic({a}, {b}, {c}) has two solutions: x1 = {result[0]:.2f}, x2 = {result[1]:.2f}")
-                else:
-                    handle.write(msg)
+                emit_info(f"solve_quadratic({a}, {b}, {c}) has two solutions: x1 = {result[0]:.2f}, x2 = {result[1]:.2f}")
 
-            success_msg = f"INFO: solve_quadratic returned {result}\n"
-            if is_logging_obj:
-                handle.info(f"solve_quadratic returned {result}")
-            else:
-                handle.write(success_msg)
+            emit_info(f"solve_quadratic returned {result}")
             return result
         except Exception as e:
-            error_msg = f"ERROR: solve_quadratic raised {type(e).__name__}: {e}\n"
-            if is_logging_obj:
-                handle.error(f"solve_quadratic raised {type(e).__name__}: {e}")
-            else:
-                handle.write(error_msg)
+            emit_error(f"solve_quadratic raised {type(e).__name__}: {e}")
             raise
 
     return inner
 
+def _solve_quadratic_core(a, b, c):
+    """Математическое ядро solve_quadratic: коэффициенты уже проверены на числовой тип."""
+    if a:
+        # Основной случай: настоящее квадратное уравнение
+        discriminant = b**2 - 4*a*c
+        if discriminant < 0:
+            return ()
+        two_a = 2*a
+        if discriminant == 0:
+            return (-b / two_a,)
+        sqrt_disc = math.sqrt(discriminant)
+        return ((-b + sqrt_disc) / two_a, (-b - sqrt_disc) / two_a)
+    if b == 0:
+        if c == 0:
+            # 0 = 0, все x подходят
+            raise ValueError("Уравнение имеет бесконечно много решений")
+        # c != 0, но 0 = c, нет решений
+        return ()
+    # bx + c = 0 -> x = -c/b
+    return (-c / b,)
+
+
+# typed=True: для int дискриминант точный, для float - округлённый, поэтому 1 и 1.0 -
+# разные ключи. 0.0 и -0.0 кэш всё равно не различает, а знак нуля влияет на знак корня,
+# поэтому уравнения с нулевыми коэффициентами решаются без кэша (см. _solve_quadratic_memo).
+_solve_quadratic_cached = functools.lru_cache(maxsize=1024, typed=True)(_solve_quadratic_core)
+
+
+def _solve_quadratic_memo(a, b, c):
+    """Решает уравнение с запоминанием результата; логирование остаётся снаружи."""
+    if a and b and c:
+        return _solve_quadratic_cached(a, b, c)
+    return _solve_quadratic_core(a, b, c)
+
+
 @solve_quadratic_logger
 def solve_quadratic(a, b, c):
     """Решает квадратное уравнение ax^2 + bx + c = 0."""
-    if not all(isinstance(i, (int, float)) for i in [a, b, c]):
+    if not (isinstance(a, (int, float)) and isinstance(b, (int, float)) and isinstance(c, (int, float))):
         raise TypeError("Коэффициенты должны быть числами")
-    if a == 0:
-        if b == 0:
-            if c == 0:
-                # 0 = 0, все x подходят
-                raise ValueError("Уравнение имеет бесконечно много решений")
-            else:
-                # c != 0, но 0 = c, нет решений
-                return ()
-        else:
-            # bx + c = 0 -> x = -c/b
-            return (-c / b,)
-    discriminant = b**2 - 4*a*c
-    if discriminant < 0:
-        return ()
-    elif discriminant == 0:
-        return (-b / (2*a),)
-    else:
-        sqrt_disc = math.sqrt(discriminant)
-        x1 = (-b + sqrt_disc) / (2*a)
-        x2 = (-b - sqrt_disc) / (2*a)
-        return (x1, x2)
+    return _solve_quadratic_memo(a, b, c)
+
+
+def solve_quadratic_batch(a_values, b_values, c_values) -> list:
+    """
+    Решает набор квадратных уравнений с коэффициентами a_values[i], b_values[i], c_values[i].
+    Возвращает список кортежей корней; логирование для каждого уравнения не выполняется.
+    """
+    results = []
+    for a, b, c in zip(a_values, b_values, c_values, strict=True):
+        if not (isinstance(a, (int, float)) and isinstance(b, (int, float)) and isinstance(c, (int, float))):
+            raise TypeError("Коэффициенты должны быть числами")
+        results.append(_solve_quadratic_memo(a, b, c))
+    return results
 
 
 # 6. Тестирование
@@ -247,6 +373,96 @@ def solve_quadratic(a, b, c):
 #             get_currencies(['USD'], url="https://httpbin.org/json") # Возвращает {"slideshow": ...}
 #
 #
+class TestValuteCache(unittest.TestCase):
+    """Проверка кэша _fetch_valute без обращения к сети."""
+    URL = "https://example.test/daily_json.js"
+    PAYLOAD = b'{"Valute": {"USD": {"Value": 90.5}, "EUR": {"Value": 99.1}}}'
+
+    def setUp(self):
+        _valute_cache.clear()
+        self.addCleanup(_valute_cache.clear)
+
+    @staticmethod
+    def _response(content):
+        response = mock.Mock()
+        response.content = content
+        return response
+
+    def test_cache_hit_within_ttl(self):
+        """Повторный запрос в пределах TTL (даже с другими кодами) не обращается к API."""
+        with mock.patch.object(_session, 'get', return_value=self._response(self.PAYLOAD)) as get:
+            self.assertEqual(get_currencies(['USD', 'EUR'], self.URL), {'USD': 90.5, 'EUR': 99.1})
+            self.assertEqual(get_currencies(['USD'], self.URL), {'USD': 90.5})
+        self.assertEqual(get.call_count, 1)
+
+    def test_cache_expires_after_ttl(self):
+        """После истечения TTL данные запрашиваются заново."""
+        with mock.patch.object(_session, 'get', return_value=self._response(self.PAYLOAD)) as get, \
+                mock.patch('time.monotonic', return_value=1000.0) as monotonic:
+            get_currencies(['USD'], self.URL)
+            monotonic.return_value = 1000.0 + _VALUTE_CACHE_TTL - 1
+            get_currencies(['USD'], self.URL)
+            self.assertEqual(get.call_count, 1)
+            monotonic.return_value = 1000.0 + _VALUTE_CACHE_TTL
+            get_currencies(['USD'], self.URL)
+        self.assertEqual(get.call_count, 2)
+
+    def test_failures_are_not_cached(self):
+        """Ошибки сети и некорректный JSON не попадают в кэш."""
+        responses = [RequestException("timeout"), self._response(b'not json'), self._response(self.PAYLOAD)]
+        with mock.patch.object(_session, 'get', side_effect=responses) as get:
+            with self.assertRaises(ConnectionError):
+                get_currencies(['USD'], self.URL)
+            with self.assertRaises(ValueError):
+                get_currencies(['USD'], self.URL)
+            self.assertEqual(_valute_cache, {})
+            self.assertEqual(get_currencies(['USD'], self.URL), {'USD': 90.5})
+        self.assertEqual(get.call_count, 3)
+
+    def test_evicts_expired_before_oldest(self):
+        """При переполнении сначала удаляются устаревшие записи, затем самая старая."""
+        urls = [f"{self.URL}?date={i}" for i in range(4)]
+        with mock.patch.object(_session, 'get', return_value=self._response(self.PAYLOAD)), \
+                mock.patch(f'{__name__}._VALUTE_CACHE_MAXSIZE', 3), \
+                mock.patch('time.monotonic', return_value=1000.0) as monotonic:
+            for url in urls[:3]:
+                get_currencies(['USD'], url)
+            # Устаревает только вторая запись: вытесняется она, а не самая старая
+            _valute_cache[urls[1]] = (0.0, _valute_cache[urls[1]][1])
+            get_currencies(['USD'], urls[3])
+            self.assertEqual(list(_valute_cache), [urls[0], urls[2], urls[3]])
+            # Устаревших записей нет: вытесняется самая старая
+            monotonic.return_value = 1001.0
+            get_currencies(['USD'], urls[1])
+            self.assertEqual(list(_valute_cache), [urls[2], urls[3], urls[1]])
+
+    def test_parallel_fills_hold_cache_lock(self):
+        """Потоки get_currencies_parallel изменяют кэш только под _valute_cache_lock."""
+        unlocked_writes = []
+
+        class CheckedDict(dict):
+            def __setitem__(self, key, value):
+                unlocked_writes.append(not _valute_cache_lock.locked())
+                super().__setitem__(key, value)
+
+            def __delitem__(self, key):
+                unlocked_writes.append(not _valute_cache_lock.locked())
+                super().__delitem__(key)
+
+            def pop(self, *args):
+                unlocked_writes.append(not _valute_cache_lock.locked())
+                return super().pop(*args)
+
+        urls = [f"{self.URL}?date={i}" for i in range(50)]
+        with mock.patch.object(_session, 'get', return_value=self._response(self.PAYLOAD)), \
+                mock.patch(f'{__name__}._valute_cache', CheckedDict()) as cache, \
+                mock.patch(f'{__name__}._VALUTE_CACHE_MAXSIZE', 4):
+            self.assertEqual(get_currencies_parallel(['USD'], urls), [{'USD': 90.5}] * len(urls))
+            self.assertLessEqual(len(cache), 4)
+        self.assertTrue(unlocked_writes)
+        self.assertFalse(any(unlocked_writes))
+
+
 # class TestLoggerDecorator(unittest.TestCase):
 #     def setUp(self):
 #         self.stream = io.StringIO()
@@ -314,12 +530,11 @@ if __name__ == "__main__":
         pass # Исключение проброшено, как и ожидалось
     except ValueError:
         pass # Исключение проброшено, как и ожидалось
-        # CRITICAL: Бесконечно много решений (a=0, b=0, c=0)
+    # ERROR: Бесконечно много решений (a=0, b=0, c=0)
     try:
         solve_quadratic(0, 0, 0)  # 0 = 0
-    except TypeError:  # float('inf') не является кортежем, вызывает TypeError в логгере
-        # Повторный вызов через обернутую функцию для демонстрации логирования CRITICAL
-        solve_quadratic_logger(handle=sys.stdout)(lambda a, b, c: float('inf'))(0, 0, 0)
+    except ValueError:
+        pass # Исключение залогировано декоратором и проброшено, как и ожидалось
     print("\n--- Запуск тестов ---")
     unittest.main(argv=[''], exit=False, verbosity=2)
 